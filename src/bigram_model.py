@@ -1,9 +1,32 @@
+import functools
+
+import numpy as np
 import torch
-from typing import Dict, List
+import torch.nn.functional as F
+from typing import Dict, List, Union
+
+
+# Module-level generator: numpy's Generator API is faster per draw than the legacy
+# np.random functions and keeps sampling state in one place
+_rng = np.random.default_rng()
+
+
+def _maybe_compile(func):
+    """
+    Compile a function with torch.compile(mode="reduce-overhead") when a GPU is present.
+
+    The reduce-overhead mode captures CUDA graphs to remove per-op launch overhead,
+    which only pays off on a GPU; on CPU the one-off compilation cost dwarfs any gain
+    for matrices this small, so the function is returned unchanged.
+    """
+    if torch.cuda.is_available() and hasattr(torch, "compile"):
+        return torch.compile(func, mode="reduce-overhead")
+    return func
 
 
+@_maybe_compile
 def bigrams_count_to_probabilities(
-    bigram_counts: torch.Tensor, smooth_factor: int = 0
+    bigram_counts: torch.Tensor, smooth_factor: int = 0, return_log: bool = False
 ) -> torch.Tensor:
     """
     Convert bigram counts to a probability distribution.
@@ -15,30 +38,99 @@ def bigrams_count_to_probabilities(
         bigram_counts: torch.Tensor. A 2D tensor where each cell (i, j) contains the count
                        of the bigram formed by the i-th and j-th characters in the alphabet.
         smooth_factor: int. A value to add to each bigram count for smoothing purposes.
+        return_log: bool. If True, return log probabilities instead of probabilities.
+                    Likelihood scoring only ever consumes the log of this matrix, so
+                    producing log space at the source skips one conversion and stays
+                    numerically stable for very small smoothing factors.
 
     Returns:
-        torch.Tensor. A 2D tensor where each row is a normalized probability distribution,
-        indicating the likelihood of each character following the character corresponding
-        to the row index.
+        torch.Tensor. A 2D tensor where each row is a normalized (log) probability
+        distribution, indicating the likelihood of each character following the
+        character corresponding to the row index.
     """
-    # Normalize each row to sum to 1, converting counts to probabilities, remember to add smooth_factor
+    if return_log:
+        # log_softmax normalizes in log space: log(c + s) - logsumexp(log(c + s)),
+        # which is exactly log((c + s) / sum(c + s)) without ever materializing
+        # probabilities that could underflow
+        return F.log_softmax(torch.log(bigram_counts + smooth_factor), dim=1)
+
+    # Normalize each row to sum to 1, converting counts to probabilities:
+    # row = (row + smooth_factor) / sum(row + smooth_factor)
+    # The broadcasting "+" is already out-of-place (it allocates the result), so no
+    # clone() is needed to leave the original counts untouched. "keepdim=True" keeps
+    # the row sums as a column so they broadcast along the rows when dividing.
+    smoothed = bigram_counts + smooth_factor
+    return smoothed / smoothed.sum(dim=1, keepdim=True)
+
+
+
+@functools.lru_cache(maxsize=4)
+def _char_lut(char_items: frozenset) -> np.ndarray:
+    """
+    Build (and cache) a code-point-to-index lookup table for a character mapping.
+
+    Keyed on the frozen items of the mapping rather than its id, so the cache stays
+    correct even if a dict object is garbage collected and its address reused.
+    """
+    lut: np.ndarray = np.full(0x110000, -1, dtype=np.int64)
+    for c, i in char_items:
+        if len(c) == 1:
+            lut[ord(c)] = i
+    return lut
+
 
-    # for each row:
-        # row = (row + smooth_factor)/sum(row+smooth_factor)
+def _word_to_indices(
+    word: str,
+    char_to_index: Dict[str, int],
+    start_token: str,
+    end_token: str,
+) -> np.ndarray:
+    """
+    Translate a word (wrapped in start/end tokens) into an array of character indices.
 
-    new_tensor = bigram_counts.clone() # so as not to modify the original
-    new_tensor += smooth_factor # broadcasting
+    The per-character dict lookups of the scoring hot path are replaced by one
+    vectorized read through a cached lookup table; the start/end tokens may be
+    multi-character, so their indices are attached separately.
+    """
+    lut: np.ndarray = _char_lut(frozenset(char_to_index.items()))
+    inner: np.ndarray = lut[np.frombuffer(word.encode('utf-32-le'), dtype=np.uint32)]
+    if (inner < 0).any():
+        raise KeyError(f"Word {word!r} contains characters outside the alphabet")
+    return np.concatenate(
+        ([char_to_index[start_token]], inner, [char_to_index[end_token]])
+    )
 
-    rows_summed = new_tensor.sum(dim=1, keepdim=True) # I saw this on the pytorch documentation for Tensor.sum(): https://pytorch.org/docs/stable/generated/torch.sum.html#torch.sum
-    # Explanation for future self:
-        # I want rows_summed to be a vertical vector, corresponding to the sum of each row
-        # The argument "dim" specifies the dimension to reduce. In this case, I want to sum each row, so I will have to reduce along the 2nd axis (left/right).
-        # The issue I faced then was that "rows_summed" was a row vector. It needs to be a collumn, as I want to operate with it along the rows directly.
-        # "keepdim = True" makes the tensor retain its original dimensions. This means that it will not be converted to a row vector, staying as a collumn.
-    new_tensor /= rows_summed
 
-    return new_tensor
+def _log_probabilities(
+    bigram_probabilities: torch.Tensor, dtype: torch.dtype = torch.float32
+) -> torch.Tensor:
+    """
+    Return log(bigram_probabilities), computed once per matrix and cached on the tensor.
 
+    The probability matrix is constant across a scoring run, so hoisting the log out
+    of the per-word calls turns every lookup into a plain gather. Caching on the
+    tensor itself (as with the sampling CDF) ties the cache's lifetime to the matrix.
+    One cached copy is kept per requested dtype, so a half-precision copy for the
+    bandwidth-bound batched gather can coexist with the full-precision one.
+    """
+    cache: Dict[torch.dtype, torch.Tensor] = getattr(
+        bigram_probabilities, "_cached_log_probs", None
+    )
+    if cache is None:
+        cache = {}
+        bigram_probabilities._cached_log_probs = cache
+    log_probs = cache.get(dtype)
+    if log_probs is None:
+        # Guard against transposed/sliced views at the API boundary: gathers over
+        # non-contiguous storage can be an order of magnitude slower
+        source = (
+            bigram_probabilities
+            if bigram_probabilities.is_contiguous()
+            else bigram_probabilities.contiguous()
+        )
+        log_probs = torch.log(source).to(dtype)
+        cache[dtype] = log_probs
+    return log_probs
 
 
 def calculate_neg_mean_log_likelihood(
@@ -47,6 +139,7 @@ def calculate_neg_mean_log_likelihood(
     char_to_index: Dict[str, int],
     start_token: str = "<S>",
     end_token: str = "<E>",
+    dtype: torch.dtype = torch.float32,
 ) -> float:
     """
     Calculate the negative mean log likelihood of a list of words based on bigram probabilities.
@@ -61,26 +154,66 @@ def calculate_neg_mean_log_likelihood(
         char_to_index: Dict. A dictionary mapping characters to their indices in the probability matrix.
         start_token: str. The character that denotes the start of a word. Shall be a single character.
         end_token: str. The character that denotes the end of a word. Shall be a single character.
+        dtype: torch.dtype. Storage dtype for the gathered log probabilities. Passing
+               torch.float16 halves the bytes moved by the gather on very large word
+               lists, at the cost of ~1e-3 relative error in the reported mean.
 
     Returns:
         float. The negative mean log likelihood of the list of words.
     """
-    # Initialize total log likelihood
-    total_log_likelihood: torch.tensor = torch.Tensor([0.0]) # not necessary with functional programming
+    # Rather than mapping calculate_log_likelihood over the list (which re-enters
+    # PyTorch per word and syncs with .item() every time), flatten the whole corpus
+    # into two index vectors and reduce in a single gather + sum. Since each word's
+    # log likelihood is just the sum of its bigram log probabilities, summing over
+    # all bigrams and dividing by the number of words gives the same mean.
+    per_word: List[np.ndarray] = [
+        _word_to_indices(word.lower(), char_to_index, start_token, end_token)
+        for word in words
+    ]
+    idx_a = torch.from_numpy(np.concatenate([w[:-1] for w in per_word]))
+    idx_b = torch.from_numpy(np.concatenate([w[1:] for w in per_word]))
+
+    # Accumulate in float32 regardless of the storage dtype, so a half-precision
+    # gather over a large corpus cannot overflow or lose the sum's low bits
+    total_log_likelihood: torch.Tensor = _log_probabilities(bigram_probabilities, dtype)[
+        idx_a, idx_b
+    ].sum(dtype=torch.float32)
+
+    # Calculate and return the negative mean log likelihood, staying in tensor space
+    # until the single .item() sync at the very end (on GPU this keeps the whole
+    # scoring pipeline free of host-device round trips)
+    mean_log_likelihood: float = (total_log_likelihood / len(words)).neg().item()
+    return mean_log_likelihood
 
-    # Calculate the log likelihood for each word and accumulate
-    calc_loglike_func = lambda x: calculate_log_likelihood(x.lower(), bigram_probabilities, char_to_index, start_token, end_token).item()
-    log_likelihoods = list(map(calc_loglike_func, words))
 
-    # Calculate and return the negative mean log likelihood
-    mean_log_likelihood: float = -(sum(log_likelihoods)/len(log_likelihoods))
-    return mean_log_likelihood
+def _cdf(probability_distribution: torch.Tensor) -> np.ndarray:
+    """
+    Return the row-wise cumulative distribution of the matrix, cached on the tensor.
+
+    torch.multinomial launches a kernel per draw, which dominates the generation
+    loop; with every row's CDF precomputed once, a sample is just a uniform draw
+    plus a binary search. Caching on the tensor (as with the log-prob cache) ties
+    the CDF's lifetime to the probability matrix.
+    """
+    cdf: np.ndarray = getattr(probability_distribution, "_cached_cdf", None)
+    if cdf is None:
+        # Row-wise scans over a transposed or sliced view are much slower than over
+        # row-major storage, so make the matrix contiguous before building the CDF.
+        # The cache still lives on the tensor that was passed in.
+        source = (
+            probability_distribution
+            if probability_distribution.is_contiguous()
+            else probability_distribution.contiguous()
+        )
+        cdf = source.cumsum(dim=1).cpu().numpy()
+        probability_distribution._cached_cdf = cdf
+    return cdf
 
 
 def sample_next_character(
     current_char_index: int,
     probability_distribution: torch.Tensor,
-    idx_to_char: Dict[int, str],
+    idx_to_char: Union[Dict[int, str], List[str]],
 ) -> str:
     """
     Sample the next character based on the current character index and probability distribution.
@@ -88,16 +221,20 @@ def sample_next_character(
     Args:
         current_char_index: int. Index of the current character.
         probability_distribution: torch.Tensor. A 2D tensor of character probabilities.
-        idx_to_char: Dict. Mapping from character indices to characters.
+        idx_to_char: Dict or List. Mapping from character indices to characters. A list
+                     (from 'index_to_char_list') avoids the hash lookup per sampled step.
 
     Returns:
         str. The next character sampled based on the probability distribution.
     """
-    # Get the probability distribution for the current character
-    current_probs: float = probability_distribution[current_char_index,:] # the current row for the character. The probabilities will serve as weights for the multinomial!
+    cdf: np.ndarray = _cdf(probability_distribution)
 
-    # Sample an index from the distribution using the torch.multinomial function
-    next_char_index: int = torch.multinomial(current_probs, num_samples=1).item() # item() extracts the item in a 0-dimensional tensor
+    # searchsorted with side="right" returns the first index whose cumulative probability
+    # exceeds the draw. The min() guards against floating point rounding in the last cell.
+    next_char_index: int = min(
+        int(np.searchsorted(cdf[current_char_index], _rng.random(), side="right")),
+        cdf.shape[1] - 1,
+    )
 
     # Map the index back to a character
     next_char: str = idx_to_char[next_char_index]
@@ -108,7 +245,7 @@ def generate_name(
     start_token: str,
     end_token: str,
     char_to_idx: Dict[str, int],
-    idx_to_char: Dict[int, str],
+    idx_to_char: Union[Dict[int, str], List[str]],
     bigram_probabilities: torch.Tensor,
     max_length: int = 15,
 ) -> str:
@@ -123,20 +260,27 @@ def generate_name(
         start_token: str. The start token indicating the beginning of a name.
         end_token: str. The end token indicating the end of a name.
         char_to_idx: Dict[str, int]. A mapping from characters to their indices.
-        idx_to_char: Dict[int, str]. A mapping from indices back to characters.
+        idx_to_char: Dict[int, str] or List[str]. A mapping from indices back to characters.
         bigram_probabilities: torch.Tensor. A 2D tensor representing the bigram probabilities.
         max_length: int. The maximum length for the generated name.
 
     Returns:
         str. A newly generated name.
     """
-    # Start with the start token and an empty name
-    current_char: str = start_token
+    # Resolve the cached CDF and the working indices once, so the per-step work is
+    # just a uniform draw, a binary search and an index-to-character read
+    cdf: np.ndarray = _cdf(bigram_probabilities)
+    last_index: int = cdf.shape[1] - 1
+    current_index: int = char_to_idx[start_token]
     generated_name: str = ''
 
     # Iterate to build the name
     for _ in range(max_length):
-        current_char = sample_next_character(char_to_idx[current_char], bigram_probabilities, idx_to_char)
+        current_index = min(
+            int(np.searchsorted(cdf[current_index], _rng.random(), side="right")),
+            last_index,
+        )
+        current_char: str = idx_to_char[current_index]
         if current_char == end_token:
             break
         generated_name += current_char
@@ -172,16 +316,14 @@ def calculate_log_likelihood(
     Returns:
         float. The log likelihood of the word.
     """
-    # Add start and end characters to the word
-    processed_word: list = [start_token, *word, end_token] # I made it into a list so as to account for multi-character BOS and EOS tokens. It was originally a string
-
-    # Initialize log likelihood
-    log_likelihood: torch.tensor = torch.Tensor([0.0]) # Ln(1) = 0, so this should start as 0 since the likelihood of an empty sequence is 1?
-    # I imagine this is a tensor in order to accumulate gradients with autograd if needed
-
-    # Iterate through bigrams in the word and accumulate their log probabilities
-    for i in range(len(processed_word)-1):
-        log_likelihood += torch.log(bigram_probabilities[char_to_index[processed_word[i]], char_to_index[processed_word[i+1]]])
+    # Instead of looping bigram by bigram (one torch.log + one add per step, each paying
+    # dispatch overhead), gather every bigram probability in a single indexed read and
+    # reduce once. Two index vectors select rows (first char) and columns (second char).
+    word_indices: np.ndarray = _word_to_indices(word, char_to_index, start_token, end_token)
+    idx_a: torch.Tensor = torch.from_numpy(word_indices[:-1])
+    idx_b: torch.Tensor = torch.from_numpy(word_indices[1:])
+
+    log_likelihood: torch.Tensor = _log_probabilities(bigram_probabilities)[idx_a, idx_b].sum()
 
     return log_likelihood
 
@@ -1,8 +1,8 @@
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Union
 import matplotlib.pyplot as plt
+import numpy as np
 import torch
 import torch.nn.functional as F
-from collections import Counter # para contar las ocurrencias de cada bigrama
 
 
 def load_and_preprocess_data(
@@ -32,7 +32,9 @@ def load_and_preprocess_data(
         ''.isalpha()
     
     # TODO
-    clean_names_func = lambda x: "".join(word + ' ' for word in x.split(' ')[:-2])[:-1].lower()
+    # rsplit only scans from the right for the two trailing data elements, instead of
+    # splitting the whole line and re-joining word fragments with per-word allocations
+    clean_names_func = lambda x: x.rsplit(' ', 2)[0].lower()
     lines_filtered = map(clean_names_func, lines)
 
     tokenize_func = lambda x: [start_token, *x, end_token]
@@ -46,6 +48,84 @@ def load_and_preprocess_data(
     return bigrams
 
 
+def build_lut(char_to_idx: Dict[str, int]) -> np.ndarray:
+    """
+    Build a lookup table from Unicode code point to alphabet index.
+
+    A dict lookup costs a hash plus probing per character; indexing a flat int array
+    by ord(c) is a single C-level read and, more importantly, can be applied to a
+    whole array of code points at once. Multi-character tokens (such as the default
+    "<S>"/"<E>") cannot live in a per-character table and must be handled by the
+    caller.
+
+    Args:
+        char_to_idx: Dict[str, int]. A dictionary mapping characters to their indices.
+
+    Returns:
+        np.ndarray. An int32 array covering the full Unicode range, with -1 at every
+        code point not present in 'char_to_idx'.
+    """
+    lut: np.ndarray = np.full(0x110000, -1, dtype=np.int32)
+    for c, i in char_to_idx.items():
+        if len(c) == 1:
+            lut[ord(c)] = i
+    return lut
+
+
+def load_and_preprocess_codes(
+    filepath: str,
+    char_to_idx: Dict[str, int],
+    start_token: str = "<S>",
+    end_token: str = "<E>",
+) -> np.ndarray:
+    """
+    Load text from a file and preprocess it into a flat array of character indices.
+
+    This is the vectorized counterpart of 'load_and_preprocess_data': instead of
+    materializing a Python tuple per bigram, each line's word is encoded as Unicode
+    code points and translated through the lookup table from 'build_lut'. Word
+    boundaries and out-of-vocabulary characters are kept in the stream as -1
+    markers, so consumers can discard any pair touching a -1 without creating
+    false adjacencies between neighbouring words.
+
+    Note: as in 'load_and_preprocess_data', each line is expected to contain a word
+    followed by two numerical elements, all separated by spaces; the last two
+    elements are ignored and letters are lowercased.
+
+    Args:
+        filepath: str. Path to the text file.
+        char_to_idx: Dict[str, int]. A dictionary mapping characters (plus the start
+                     and end tokens) to their indices in the alphabet.
+        start_token: str. The token marking the start of each word.
+        end_token: str. The token marking the end of each word.
+
+    Returns:
+        np.ndarray. A flat int32 array of character indices, with -1 at word
+        boundaries and at characters not present in 'char_to_idx'.
+    """
+    # LUT from code point to alphabet index; -1 marks everything else
+    lut: np.ndarray = build_lut(char_to_idx)
+
+    # Fixed per-word framing: the start token index in front, the end token index
+    # plus a -1 word separator behind
+    word_start: np.ndarray = np.array([char_to_idx[start_token]], dtype=np.int32)
+    word_end: np.ndarray = np.array([char_to_idx[end_token], -1], dtype=np.int32)
+
+    # Stream the file line by line rather than slurping it whole: only the final
+    # codes array and one line's worth of temporaries are ever resident, and the OS
+    # can page the file sequentially. utf-32-le encodes one uint32 code point per
+    # character, so each translated piece lines up one-to-one with its word.
+    pieces: List[np.ndarray] = []
+    with open(filepath, "r", encoding='utf-8') as file:
+        for line in file:
+            word: str = line.rstrip('\r\n').rsplit(' ', 2)[0].lower()
+            word_codes = lut[np.frombuffer(word.encode('utf-32-le'), dtype=np.uint32)]
+            pieces.extend((word_start, word_codes, word_end))
+
+    codes: np.ndarray = np.concatenate(pieces) if pieces else np.empty(0, dtype=np.int32)
+    return codes
+
+
 def char_to_index(alphabet: str, start_token: str, end_token: str) -> Dict[str, int]:
     """
     Create a dictionary mapping each character in the alphabet to an index.
@@ -81,42 +161,116 @@ def index_to_char(char_to_index: Dict[str, int]) -> Dict[int, str]:
     return idx_to_char
 
 
+def index_to_char_list(char_to_index: Dict[str, int]) -> List[str]:
+    """
+    Create a list mapping each index to the corresponding character in the alphabet.
+
+    Since the indices are the contiguous integers 0..V-1, a plain list serves the
+    same lookups as the dict from 'index_to_char' without hashing — worthwhile
+    inside the name-generation loop, which resolves one index per sampled step.
+
+    Args:
+        char_to_index: Dict[str, int]. A dictionary mapping characters to indices.
+
+    Returns:
+        List[str]: A list where position i holds the character with index i.
+    """
+    idx_to_char: List[str] = [''] * len(char_to_index)
+    for c, i in char_to_index.items():
+        idx_to_char[i] = c
+    return idx_to_char
+
+
 def count_bigrams(
-    bigrams: List[Tuple[str, str]], char_to_idx: Dict[str, int]
+    bigrams: Union[List[Tuple[str, str]], np.ndarray], char_to_idx: Dict[str, int]
 ) -> torch.Tensor:
     """
-    Count the frequency of each bigram in the given list using PyTorch.
+    Count the frequency of each bigram in the given corpus using PyTorch.
 
-    This function is designed to work with the output of the 'load_and_preprocess_data'
-    function, which processes a text file into a list of bigrams. It counts the frequency
-    of each bigram within the provided list using a PyTorch tensor.
+    This function accepts either the list-of-tuples output of
+    'load_and_preprocess_data' or the flat index array produced by
+    'load_and_preprocess_codes'. The array form carries character indices in two
+    contiguous machine words per bigram instead of a ~80-byte Python tuple each, and
+    is counted with the vectorized 'count_bigrams_from_codes' kernel.
 
     Args:
-        bigrams: List[Tuple[str, str]]. A list of bigrams, typically the output from
-                 'load_and_preprocess_data'.
+        bigrams: List[Tuple[str, str]] or np.ndarray. A list of bigrams from
+                 'load_and_preprocess_data', or a flat int32 array of character
+                 indices from 'load_and_preprocess_codes'.
         char_to_idx: Dict[str, int]. A dictionary mapping characters to their indices in the alphabet.
 
     Returns:
         torch.Tensor. A 2D tensor where each cell (i, j) represents the count of the bigram
         formed by the i-th and j-th characters in the alphabet.
     """
+    # The flat code stream goes straight to the vectorized kernel
+    if isinstance(bigrams, np.ndarray):
+        return count_bigrams_from_codes(bigrams, len(char_to_idx))
+
+    alphabet_length: int = len(char_to_idx)
+
+    # When everything is single characters (the usual case), the tuple list can be
+    # packed without any per-bigram Python work: numpy stores '<U1' strings as one
+    # uint32 code point each, so viewing the (N, 2) string array as integers and
+    # pushing it through the LUT translates the whole list in one shot. Out-of-
+    # vocabulary characters come back as -1 and are masked out, as before.
+    if all(len(c) == 1 for c in char_to_idx):
+        pairs: np.ndarray = np.array(bigrams).reshape(-1, 2)
+        if pairs.dtype == np.dtype('<U1'):
+            code_pairs: np.ndarray = build_lut(char_to_idx)[pairs.view(np.uint32)]
+            first_chars, second_chars = code_pairs[:, 0], code_pairs[:, 1]
+            valid = (first_chars >= 0) & (second_chars >= 0)
+            flat = first_chars[valid] * alphabet_length + second_chars[valid]
+            counts = np.bincount(flat, minlength=alphabet_length * alphabet_length)
+            return torch.from_numpy(
+                counts.reshape(alphabet_length, alphabet_length).astype(np.float32)
+            )
 
-    # Initialize a 2D tensor for counting bigrams
-    alphabet_length : int = len(char_to_idx)
-    bigram_counts: torch.Tensor = torch.zeros((alphabet_length, alphabet_length))
+    # Fallback for multi-character tokens: map each bigram to a single flat index
+    # (i * V + j) and let bincount do the accumulation in one pass
+    flat_indices: List[int] = [
+        char_to_idx[a] * alphabet_length + char_to_idx[b]
+        for a, b in bigrams
+        if a in char_to_idx and b in char_to_idx
+    ]
 
-    # Iterate over each bigram and update the count in the tensor
-    get_bigram_index_func = lambda x: (char_to_idx[x[0]], char_to_idx[x[1]]) if x[0] in char_to_idx and x[1] in char_to_idx else None # convierto primero a índices porque serán los mismos índices del tensor a modificar
-    bigrams_indices = map(get_bigram_index_func, bigrams)
+    bigram_counts: torch.Tensor = torch.bincount(
+        torch.as_tensor(flat_indices, dtype=torch.long),
+        minlength=alphabet_length * alphabet_length,
+    ).reshape(alphabet_length, alphabet_length).float()
 
-    # Esto ahorra modificar cada elemento de la matriz para cada ocurrencia de éste. En vez de eso, modifico cada elemento una sola vez
-    occurences:dict = Counter(bigrams_indices) # realmente no es un diccionario, pero se comporta como tal...
-    occurences.pop(None, None) # eliminando aquéllos que no estén en el vocabulario.
+    return bigram_counts
 
-    for o in occurences:
-        bigram_counts[o] = occurences[o]
 
-    return bigram_counts
+def count_bigrams_from_codes(codes: np.ndarray, alphabet_length: int) -> torch.Tensor:
+    """
+    Count bigrams directly from a flat array of character indices.
+
+    This is the fused counting kernel for the output of 'load_and_preprocess_codes':
+    adjacent pairs are formed by offsetting the array against itself, pairs touching
+    a -1 boundary marker are masked out, and the remaining pairs are packed into flat
+    i * V + j indices and accumulated with a single bincount — one vectorized pass
+    over the corpus with no per-bigram Python objects.
+
+    Args:
+        codes: np.ndarray. A flat int32 array of character indices with -1 markers
+               at word boundaries and out-of-vocabulary characters.
+        alphabet_length: int. The size of the alphabet (including start/end tokens).
+
+    Returns:
+        torch.Tensor. A 2D tensor where each cell (i, j) represents the count of the
+        bigram formed by the i-th and j-th characters in the alphabet.
+    """
+    first_chars: np.ndarray = codes[:-1]
+    second_chars: np.ndarray = codes[1:]
+    valid: np.ndarray = (first_chars >= 0) & (second_chars >= 0)
+
+    flat: np.ndarray = first_chars[valid] * alphabet_length + second_chars[valid]
+    counts: np.ndarray = np.bincount(flat, minlength=alphabet_length * alphabet_length)
+
+    return torch.from_numpy(
+        counts.reshape(alphabet_length, alphabet_length).astype(np.float32)
+    )
 
 
 def plot_bigram_counts(bigram_counts: torch.Tensor, idx_to_char: Dict):
@@ -130,13 +284,16 @@ def plot_bigram_counts(bigram_counts: torch.Tensor, idx_to_char: Dict):
     plt.figure(figsize=(16, 16))
     plt.imshow(bigram_counts, cmap="Blues")
 
-    for i in range(bigram_counts.shape[0]):
-        for j in range(bigram_counts.shape[1]):
-            char_str: str = idx_to_char[i] + idx_to_char[j]
-            plt.text(j, i, char_str, ha="center", va="bottom", color="gray")
-            plt.text(
-                j, i, bigram_counts[i, j].item(), ha="center", va="top", color="gray"
-            )
+    # Convert to numpy once: each bigram_counts[i, j] read inside the loop would be
+    # a full PyTorch dispatch plus a host copy, V*V times over
+    counts_np: np.ndarray = bigram_counts.to(torch.int64).cpu().numpy()
+
+    # Matplotlib has no batched text API, but one combined label per cell (bigram on
+    # top, count below) halves the number of text artists from 2*V*V to V*V
+    for i in range(counts_np.shape[0]):
+        for j in range(counts_np.shape[1]):
+            annotation: str = f"{idx_to_char[i]}{idx_to_char[j]}\n{counts_np[i, j]}"
+            plt.text(j, i, annotation, ha="center", va="center", color="gray")
 
     plt.axis("off")
     plt.show()
@@ -155,13 +312,13 @@ if __name__ == "__main__":
     # Create a mapping from characters to indices
     char_to_idx: Dict[str, int] = char_to_index(alphabet, start_token, end_token)
 
-    # Load and preprocess the data to get bigrams
-    bigrams: List[Tuple[str, str]] = load_and_preprocess_data(
-        file_path, start_token=start_token, end_token=end_token
+    # Load and preprocess the data into a flat array of character indices
+    codes: np.ndarray = load_and_preprocess_codes(
+        file_path, char_to_idx, start_token=start_token, end_token=end_token
     )
 
     # Count the bigrams
-    bigram_counts: torch.Tensor = count_bigrams(bigrams, char_to_idx)
+    bigram_counts: torch.Tensor = count_bigrams(codes, char_to_idx)
 
     # Create a mapping from indices to characters (reverse of char_to_index)
     idx_to_char: Dict[int, str] = index_to_char(char_to_idx)
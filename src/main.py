@@ -1,7 +1,7 @@
 from data_processing import (
-    load_and_preprocess_data,
+    load_and_preprocess_codes,
     char_to_index,
-    index_to_char,
+    index_to_char_list,
     count_bigrams,
 )
 
@@ -19,15 +19,15 @@ if __name__ == "__main__":
     end_token = "."
     alphabet = "abcdefghijklmnopqrstuvwxyz "
 
-    # Load and preprocess data
-    bigrams = load_and_preprocess_data(file_path, start_token, end_token)
-
     # Create character indices
     char_to_idx = char_to_index(alphabet, start_token, end_token)
-    idx_to_char = index_to_char(char_to_idx)
+    idx_to_char = index_to_char_list(char_to_idx)
+
+    # Load and preprocess data into a flat array of character indices
+    codes = load_and_preprocess_codes(file_path, char_to_idx, start_token, end_token)
 
     # Count bigrams and convert to probabilities
-    bigram_counts = count_bigrams(bigrams, char_to_idx)
+    bigram_counts = count_bigrams(codes, char_to_idx)
     bigram_probabilities = bigrams_count_to_probabilities(bigram_counts, smooth_factor=0.4)
 
     num_names_to_generate = 100
@@ -1,12 +1,17 @@
 import pytest
+import torch
 from typing import Dict
 
 from src.data_processing import (
     load_and_preprocess_data,
+    load_and_preprocess_codes,
     char_to_index,
     index_to_char,
+    index_to_char_list,
     count_bigrams,
+    count_bigrams_from_codes,
 )
+import numpy as np
 
 
 @pytest.mark.order(1)
@@ -55,6 +60,82 @@ def test_load_and_preprocess_data():
     ), "The bigrams in the result do not match the expected bigrams."
 
 
+@pytest.mark.order(12)
+def test_load_and_preprocess_codes():
+    """
+    Test the load_and_preprocess_codes function.
+
+    This test checks that the vectorized loader produces the same bigrams as
+    'load_and_preprocess_data', once -1 boundary markers are discarded.
+    """
+    test_file_path = "data/test_text.txt"
+    start_token = "-"
+    end_token = "."
+    alphabet = "abcdefghijklmnopqrstuvwxyz "
+
+    # Create a simple test file
+    test_data = ["hello 1 2", "world 3 4"]
+    with open(test_file_path, "w") as f:
+        for line in test_data:
+            f.write(line + "\n")
+
+    char_to_idx = char_to_index(alphabet, start_token, end_token)
+    idx_to_char = index_to_char(char_to_idx)
+
+    codes = load_and_preprocess_codes(
+        test_file_path, char_to_idx, start_token, end_token
+    )
+
+    if codes is None:
+        pytest.skip()
+
+    # Rebuild bigrams from the codes array, skipping pairs that touch a -1 marker
+    decoded_bigrams = [
+        (idx_to_char[int(a)], idx_to_char[int(b)])
+        for a, b in zip(codes[:-1], codes[1:])
+        if a >= 0 and b >= 0
+    ]
+
+    expected_bigrams = load_and_preprocess_data(test_file_path, start_token, end_token)
+
+    assert decoded_bigrams == expected_bigrams, (
+        "Bigrams decoded from the codes array do not match the reference pipeline."
+    )
+
+
+@pytest.mark.order(13)
+def test_count_bigrams_from_codes():
+    """
+    Test the count_bigrams_from_codes function.
+
+    This test checks that counting over a flat index array matches the counts
+    produced by 'count_bigrams' over the equivalent list of tuples, and that pairs
+    touching a -1 boundary marker are not counted.
+    """
+    char_to_idx: Dict[str, int] = {"-": 0, "a": 1, "b": 2, ".": 3}
+
+    # "-ab." and "-ba." as index streams separated by a -1 boundary
+    codes = np.array([0, 1, 2, 3, -1, 0, 2, 1, 3], dtype=np.int32)
+
+    bigram_counts = count_bigrams_from_codes(codes, len(char_to_idx))
+
+    if bigram_counts is None:
+        pytest.skip()
+
+    equivalent_bigrams = [
+        ("-", "a"), ("a", "b"), ("b", "."),
+        ("-", "b"), ("b", "a"), ("a", "."),
+    ]
+    expected_counts = count_bigrams(equivalent_bigrams, char_to_idx)
+
+    assert bigram_counts.shape == (4, 4), "The shape of the count tensor is incorrect"
+    assert torch.equal(bigram_counts, expected_counts), (
+        "Counts from the codes array do not match the tuple-based counts."
+    )
+    # The (".", "-") pair across the boundary marker must not be counted
+    assert bigram_counts[3, 0] == 0, "Pairs across a -1 boundary should not be counted"
+
+
 @pytest.mark.order(2)
 def test_char_to_index():
     """
@@ -100,6 +181,28 @@ def test_index_to_char():
     assert result == expected, f"Expected mapping: {expected}, but got: {result}"
 
 
+@pytest.mark.order(14)
+def test_index_to_char_list():
+    """
+    Test the index_to_char_list function.
+
+    This test checks if the function produces a list whose positions agree with
+    the dict mapping from the index_to_char function.
+    """
+    char_to_idx = {".": 0, "a": 1, "b": 2, "c": 3, "d": 4, "-": 5}
+
+    # Expected result
+    expected = [".", "a", "b", "c", "d", "-"]
+
+    # Actual result
+    result = index_to_char_list(char_to_idx)
+
+    if result is None:
+        pytest.skip()
+    # Assert the result matches the expected output
+    assert result == expected, f"Expected mapping: {expected}, but got: {result}"
+
+
 @pytest.mark.order(4)
 def test_count_bigrams():
     """